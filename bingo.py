@@ -1,17 +1,42 @@
 import json
+import mmap
+import os
 import random
-import numpy as np
+from math import comb
 from fpdf import FPDF, XPos, YPos
+from fpdf.enums import MethodReturnValue
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# shared random number generator, used when no rng is passed in
+_DEFAULT_RNG = random.Random()
 
 
 def load_json(json_file):
-    """Load a json file and return the data as a dict."""
-    with open(json_file, "r") as f:
-        data = json.load(f)
+    """Load a json file and return the data as a dict.
+    Uses orjson on a memory-mapped file if it is installed, otherwise falls
+    back to the stdlib json.
+    """
+    if orjson is None:
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data
+
+    # parse straight from the page cache instead of reading into a buffer first
+    with open(json_file, "rb") as f:
+        # empty files can't be mapped, let orjson report them as invalid json
+        if os.fstat(f.fileno()).st_size == 0:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                data = orjson.loads(view)
     return data
 
 
-def create_sheet(data, size=4):
+def create_sheet(data, size=4, rng=None):
     """Create a bingo sheet from the data.
     The data should be a dict with the following keys:
     - title: the title of the bingo sheet
@@ -21,6 +46,8 @@ def create_sheet(data, size=4):
     Args:
         data (dict): dict for the bingo sheet
         size (int, optional): Side length of bingo square. Defaults to 4.
+        rng (random.Random, optional): Random number generator to draw the
+            statements with. Defaults to a shared module-level generator.
 
     Returns:
         dict: A dict with the following keys:
@@ -38,27 +65,26 @@ def create_sheet(data, size=4):
         raise ValueError(
             f"Not enough statements to fill the bingo sheet. Need {amount} but only have {len(statements)}"
         )
-    random.shuffle(statements)
-    statements = statements[:amount]
+    # sample without shuffling (and mutating) the whole statement list
+    if rng is None:
+        rng = _DEFAULT_RNG
+    statements = rng.sample(statements, amount)
 
     # create bingo sheet
-    sheet = []
-    for i in range(size):
-        row = []
-        for j in range(size):
-            row.append(statements[i * size + j])
-        sheet.append(row)
+    sheet = [statements[i * size : (i + 1) * size] for i in range(size)]
 
     return {"header": header, "title": title, "statements": sheet}
 
 
-def create_sheets(data, size=4, amount=1):
+def create_sheets(data, size=4, amount=1, rng=None):
     """Create multiple bingo sheets from the data.
 
     Args:
         data (dict): dict generated from the json file
         size (int, optional): Side length of bingo square. Defaults to 4.
         amount (int, optional): Number of bingo sheets to create. Defaults to 1.
+        rng (random.Random, optional): Random number generator shared by all
+            sheets. Defaults to a shared module-level generator.
 
     Returns:
         list: A list of dicts with the following keys:
@@ -68,12 +94,12 @@ def create_sheets(data, size=4, amount=1):
     """
     sheets = []
     for i in range(amount):
-        sheets.append(create_sheet(data, size))
+        sheets.append(create_sheet(data, size, rng))
     return sheets
 
 
 def check_uniqueness(sheets):
-    """Check if the bingo sheets are unique. Warning: expensive.
+    """Check if the bingo sheets are unique.
 
     Args:
         sheets (list): list of dicts with the following keys:
@@ -87,23 +113,156 @@ def check_uniqueness(sheets):
     if len(sheets) < 2:
         return True
 
-    statements = []
-    for sheet in sheets:
+    seen = {}
+    for i, sheet in enumerate(sheets):
         # flatten the statements, keeping the order
-        flat_statements = [
-            statement for row in sheet["statements"] for statement in row
-        ]
-        statements.append(flat_statements)
-    # check if all statements are unique
-    for i in range(len(statements)):
-        for j in range(i + 1, len(statements)):
-            if statements[i] == statements[j]:
-                print(f"Duplicate sheets found: {i} and {j}")
-                return False
+        key = tuple(statement for row in sheet["statements"] for statement in row)
+        if key in seen:
+            print(f"Duplicate sheets found: {seen[key]} and {i}")
+            return False
+        seen[key] = i
 
     return True
 
 
+def _wrap_lines(pdf, text, width, height, word_widths):
+    """Break text into lines that fit into a cell of the given size.
+    Uses the current font of the pdf, with one font size per line. Word widths
+    are looked up in and added to word_widths, so repeated words are only
+    measured once.
+
+    Only breaks at single spaces. Text that fpdf would break differently (at
+    hyphens, newlines or inside overlong words) or that does not fit into the
+    cell height is left to multi_cell by returning None.
+
+    Args:
+        pdf (FPDF): pdf with the font of the text already set
+        text (str): text to wrap
+        width (float): width of the cell
+        height (float): height of the cell
+        word_widths (dict): cache mapping words to their string width
+
+    Returns:
+        list: the lines of the wrapped text, or None if multi_cell is needed
+    """
+    words = text.split()
+    if " ".join(words) != text or "\u00ad" in text:
+        return None
+
+    max_width = width - 2 * pdf.c_margin
+    if " " not in word_widths:
+        word_widths[" "] = pdf.get_string_width(" ")
+    space_width = word_widths[" "]
+
+    lines = []
+    line = []
+    line_width = 0
+    for word in words:
+        if word not in word_widths:
+            word_widths[word] = pdf.get_string_width(word)
+        word_width = word_widths[word]
+        if word_width > max_width:
+            return None
+        if line and line_width + space_width + word_width > max_width:
+            lines.append(" ".join(line))
+            line = []
+            line_width = 0
+        if line:
+            line_width += space_width
+        line.append(word)
+        line_width += word_width
+    lines.append(" ".join(line))
+
+    if len(lines) > 1 and ("-" in text or len(lines) * pdf.font_size > height):
+        return None
+    return lines
+
+
+def _text_cell(pdf, text, lines, width, height, border=0):
+    """Draw centered text into a cell at the current position.
+    Text with precomputed lines is drawn with plain cells, anything else goes
+    through multi_cell, which grows the cell if the text does not fit.
+    The position is left at the top left corner of the cell.
+
+    Args:
+        pdf (FPDF): pdf to draw on, with the font of the text already set
+        text (str): text of the cell
+        lines (list): lines of the text from _wrap_lines, or None
+        width (float): width of the cell
+        height (float): height of the cell
+        border (int, optional): 1 to draw a border around the cell. Defaults to 0.
+
+    Returns:
+        float: the height of the drawn cell
+    """
+    if lines is None:
+        # slow path: let fpdf break the text
+        return pdf.multi_cell(
+            width,
+            height,
+            text=text,
+            border=border,
+            align="C",
+            max_line_height=pdf.font_size,
+            new_x=XPos.LEFT,
+            new_y=YPos.TOP,
+            output=MethodReturnValue.HEIGHT,
+        )
+
+    if len(lines) == 1:
+        pdf.cell(
+            width,
+            height,
+            text=text,
+            border=border,
+            align="C",
+            new_x=XPos.LEFT,
+            new_y=YPos.TOP,
+        )
+        return height
+
+    # draw the border once, then the wrapped lines from the top
+    x, y = pdf.get_x(), pdf.get_y()
+    if border:
+        pdf.rect(x, y, width, height)
+    for line in lines:
+        pdf.cell(
+            width,
+            pdf.font_size,
+            text=line,
+            align="C",
+            new_x=XPos.LEFT,
+            new_y=YPos.NEXT,
+        )
+    pdf.set_xy(x, y)
+    return height
+
+
+def _draw_grid(pdf, statements, cell_width, cell_height, wrapped):
+    """Draw the statement grid of one bingo sheet at the current position.
+    The statement font has to be set on the pdf already.
+
+    Args:
+        pdf (FPDF): pdf to draw on
+        statements (list): 2d list of statements of the bingo sheet
+        cell_width (float): width of a grid cell
+        cell_height (float): height of a grid cell
+        wrapped (dict): maps each statement to its wrapped lines, or to None
+            if it has to be drawn with multi_cell
+    """
+    for row in statements:
+        # a row is as high as its highest cell
+        row_height = cell_height
+        for statement in row:
+            height = _text_cell(
+                pdf, statement, wrapped[statement], cell_width, cell_height, border=1
+            )
+            row_height = max(row_height, height)
+            pdf.set_x(pdf.get_x() + cell_width)
+
+        pdf.ln(row_height)
+
+
 def create_pdf(sheets, filename="bingo.pdf"):
     """Create a pdf from the bingo sheets.
 
@@ -127,10 +286,30 @@ def create_pdf(sheets, filename="bingo.pdf"):
     font = "Helvetica"
 
     # set grid and cell sizes
-    grid_size = np.sqrt(len(sheets[0]["statements"]))
-    grid_size = int(grid_size)
-    cell_width = 95 / grid_size
-    cell_height = 40 / grid_size
+    grid_size = len(sheets[0]["statements"])
+    cell_width = 190 / grid_size
+    cell_height = 80 / grid_size
+
+    # wrap every distinct statement once, instead of once per cell and sheet
+    pdf.set_font(font, size=statement_font_size)
+    word_widths = {}
+    wrapped = {
+        statement: _wrap_lines(pdf, statement, cell_width, cell_height, word_widths)
+        for statement in {
+            statement
+            for sheet in sheets
+            for row in sheet["statements"]
+            for statement in row
+        }
+    }
+
+    # the header is usually the same on every sheet, so wrap it once as well
+    pdf.set_font(font, "I", header_font_size)
+    header_word_widths = {}
+    wrapped_headers = {
+        header: _wrap_lines(pdf, header, 200, 10, header_word_widths)
+        for header in {sheet["header"] for sheet in sheets}
+    }
 
     title_height = 0
     header_height = 0
@@ -150,35 +329,17 @@ def create_pdf(sheets, filename="bingo.pdf"):
 
         # add header
         pdf.set_font(font, "I", header_font_size)
-        pdf.multi_cell(
-            200,
-            10,
-            text=sheet["header"],
-            new_x=XPos.LMARGIN,
-            new_y=YPos.NEXT,
-            align="C",
-            max_line_height=pdf.font_size,
+        header_top = pdf.get_y()
+        header_cell_height = _text_cell(
+            pdf, sheet["header"], wrapped_headers[sheet["header"]], 200, 10
         )
+        pdf.set_y(header_top + header_cell_height)
         if i == 0:
             header_height = pdf.get_y()
 
         # create grid
         pdf.set_font(font, size=statement_font_size)
-        for row in sheet["statements"]:
-            for statement in row:
-                # place text in cell, ensure that if the text is too long, the line breaks
-                pdf.multi_cell(
-                    cell_width,
-                    cell_height,
-                    text=statement,
-                    border=1,
-                    align="C",
-                    max_line_height=pdf.font_size,
-                    # new_x=XPos.RIGHT,
-                    new_y=YPos.TOP,
-                )
-
-            pdf.ln()
+        _draw_grid(pdf, sheet["statements"], cell_width, cell_height, wrapped)
 
         if i == 0:
             grid_height = pdf.get_y()
@@ -201,6 +362,7 @@ def main():
     max_tries = 10  # max tries to generate unique sheets.
     size = 4  # default size of bingo sheet
     filename = "sheets.pdf"  # default filename
+    rng = random.Random()  # seed this to get reproducible sheets
 
     while True:
         # get amount from user
@@ -212,10 +374,18 @@ def main():
         except ValueError:
             print("Invalid input. Please enter a number.")
 
+    # a single sheet is always unique. If there are far more possible sheets than
+    # pairs of sheets, duplicates are practically impossible (birthday bound).
+    # In both cases skip the uniqueness check.
+    skip_check = (
+        amount < 2
+        or comb(len(data["statements"]), size * size) > amount * amount * 1000
+    )
+
     # create bingo sheets until the generated sheets are unique
     for _ in range(max_tries):
-        sheets = create_sheets(data, size, amount)
-        if check_uniqueness(sheets):
+        sheets = create_sheets(data, size, amount, rng)
+        if skip_check or check_uniqueness(sheets):
             break
         else:
             print("Bingo sheets are not unique. Generating again...")